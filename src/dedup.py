@@ -6,16 +6,31 @@ Uses article URL as the unique identifier, with a hash fallback for
 articles with identical URLs but different content.
 """
 
-import hashlib
 import logging
 import sqlite3
-from datetime import datetime, timezone
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Iterable
+
+import xxhash
 
 logger = logging.getLogger(__name__)
 
 DB_PATH = "data/seen_articles.db"
 
+# Bumped whenever stored data needs migrating (tracked via PRAGMA user_version)
+#   1: url_hash switched from SHA-256 to 64-bit XXH3 hex
+#   2: url_hash stored as a raw 16-byte XXH3-128 BLOB
+SCHEMA_VERSION = 2
+
+# Rows per multi-row INSERT (6 bound values each, well under SQLite's limit)
+INSERT_CHUNK_SIZE = 500
+
+# INSERT ... RETURNING needs SQLite 3.35+; older builds (e.g. Debian
+# Bullseye's 3.34) use INSERT OR IGNORE and count rows via total_changes
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
 
 class DedupTracker:
     """Tracks which articles have already been sent to Teams."""
@@ -23,49 +38,121 @@ class DedupTracker:
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
         self._ensure_db_dir()
+        self._conn = self._connect()
         self._init_db()
+        self._seen = self._load_seen()
 
     def _ensure_db_dir(self):
         """Create the data directory if it doesn't exist."""
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open the long-lived connection shared by every tracker call."""
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in one explicit transaction."""
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
+
     def _init_db(self):
         """Initialize the SQLite database and create table if needed."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS seen_articles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    url_hash TEXT UNIQUE NOT NULL,
-                    title TEXT,
-                    url TEXT,
-                    source_name TEXT,
-                    sent_at TEXT NOT NULL,
-                    relevance_score REAL DEFAULT 0
-                )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_url_hash
-                ON seen_articles (url_hash)
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_sent_at
-                ON seen_articles (sent_at)
-            """)
-            conn.commit()
-
-    def _hash_url(self, url: str) -> str:
-        """Create a SHA-256 hash of the article URL."""
-        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+        with self._transaction() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'seen_articles'"
+            ).fetchone()
+            if exists:
+                self._migrate(conn)
+            else:
+                self._create_schema(conn)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        """Create the seen_articles table and its indexes."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url_hash BLOB UNIQUE NOT NULL,
+                title TEXT,
+                url TEXT,
+                source_name TEXT,
+                sent_at TEXT NOT NULL,
+                relevance_score REAL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_url_hash
+            ON seen_articles (url_hash)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sent_at
+            ON seen_articles (sent_at)
+        """)
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Bring a database written by an older version up to SCHEMA_VERSION."""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        # Versions 0-1 keyed rows by hex TEXT hashes. Rebuild the table with
+        # a BLOB key, re-hashing every row from its stored URL so articles
+        # sent before the change are still recognised as seen.
+        conn.execute("ALTER TABLE seen_articles RENAME TO seen_articles_old")
+        conn.execute("DROP INDEX IF EXISTS idx_url_hash")
+        conn.execute("DROP INDEX IF EXISTS idx_sent_at")
+        self._create_schema(conn)
+
+        rows = conn.execute(
+            "SELECT id, title, url, source_name, sent_at, relevance_score "
+            "FROM seen_articles_old"
+        ).fetchall()
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO seen_articles
+            (id, url_hash, title, url, source_name, sent_at, relevance_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (row_id, self._hash_url(url or ""), title, url, source, sent_at, score)
+                for row_id, title, url, source, sent_at, score in rows
+            ],
+        )
+        conn.execute("DROP TABLE seen_articles_old")
+        if rows:
+            logger.info(f"Re-hashed {len(rows)} tracked articles")
+
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _load_seen(self) -> set[bytes]:
+        """Load every tracked URL hash so lookups never touch the DB."""
+        cursor = self._conn.execute("SELECT url_hash FROM seen_articles")
+        return {row[0] for row in cursor}
+
+    def _hash_url(self, url: str) -> bytes:
+        """Create a 128-bit XXH3 digest of the article URL (dedup key only)."""
+        return xxhash.xxh3_128_digest(url.encode("utf-8"))
 
     def is_seen(self, article) -> bool:
         """Check if an article has already been sent."""
-        url_hash = self._hash_url(article.link)
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT 1 FROM seen_articles WHERE url_hash = ?",
-                (url_hash,),
-            )
-            return cursor.fetchone() is not None
+        return self._hash_url(article.link) in self._seen
 
     def mark_seen(self, article):
         """Mark an article as sent."""
@@ -74,7 +161,7 @@ class DedupTracker:
         score = getattr(article, "relevance_score", 0)
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 conn.execute(
                     """
                     INSERT OR IGNORE INTO seen_articles
@@ -90,45 +177,86 @@ class DedupTracker:
                         score,
                     ),
                 )
-                conn.commit()
         except sqlite3.Error as e:
             logger.error(f"Failed to mark article as seen: {e}")
+            return
+
+        self._seen.add(url_hash)
+
+    def mark_batch_seen(self, articles: list) -> int:
+        """
+        Mark multiple articles as sent in a single transaction.
 
-    def mark_batch_seen(self, articles: list):
-        """Mark multiple articles as sent in a single transaction."""
+        Returns the number of articles that were not already tracked.
+        """
         sent_at = datetime.now(timezone.utc).isoformat()
+        rows = [
+            (
+                self._hash_url(article.link),
+                article.title[:200],
+                article.link,
+                article.source_name,
+                sent_at,
+                getattr(article, "relevance_score", 0),
+            )
+            for article in articles
+        ]
+
+        insert = self._insert_returning if _HAS_RETURNING else self._insert_or_ignore
+        try:
+            with self._transaction() as conn:
+                new_count = insert(conn, rows)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to mark articles as seen: {e}")
+            return 0
+
+        # Every hash is in the table now, whether inserted or already there
+        self._seen.update(row[0] for row in rows)
 
-        with sqlite3.connect(self.db_path) as conn:
-            for article in articles:
-                url_hash = self._hash_url(article.link)
-                score = getattr(article, "relevance_score", 0)
-                try:
-                    conn.execute(
-                        """
-                        INSERT OR IGNORE INTO seen_articles
-                        (url_hash, title, url, source_name, sent_at, relevance_score)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            url_hash,
-                            article.title[:200],
-                            article.link,
-                            article.source_name,
-                            sent_at,
-                            score,
-                        ),
-                    )
-                except sqlite3.Error as e:
-                    logger.error(f"Failed to mark article: {e}")
-            conn.commit()
-
-        logger.info(f"Marked {len(articles)} articles as seen")
-
-    def filter_unseen(self, articles: list) -> list:
+        logger.info(
+            f"Marked {new_count} articles as seen "
+            f"({len(articles) - new_count} already tracked)"
+        )
+        return new_count
+
+    def _insert_returning(self, conn: sqlite3.Connection, rows: list) -> int:
+        """Insert rows, returning how many were new (SQLite 3.35+)."""
+        # Multi-row INSERT ... RETURNING reports exactly which rows were new
+        # (executemany would discard the RETURNING rows)
+        inserted = 0
+        for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+            chunk = rows[i:i + INSERT_CHUNK_SIZE]
+            values = ", ".join(["(?, ?, ?, ?, ?, ?)"] * len(chunk))
+            cursor = conn.execute(
+                f"""
+                INSERT INTO seen_articles
+                (url_hash, title, url, source_name, sent_at, relevance_score)
+                VALUES {values}
+                ON CONFLICT (url_hash) DO NOTHING
+                RETURNING url_hash
+                """,
+                [value for row in chunk for value in row],
+            )
+            inserted += len(cursor.fetchall())
+        return inserted
+
+    def _insert_or_ignore(self, conn: sqlite3.Connection, rows: list) -> int:
+        """Insert rows, returning how many were new (any SQLite version)."""
+        before = conn.total_changes
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO seen_articles
+            (url_hash, title, url, source_name, sent_at, relevance_score)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        return conn.total_changes - before
+
+    def filter_unseen(self, articles: Iterable) -> list:
         """Filter out already-seen articles, returning only new ones."""
         unseen = []
         seen_count = 0
-
         for article in articles:
             if self.is_seen(article):
                 seen_count += 1
@@ -143,28 +271,26 @@ class DedupTracker:
 
     def cleanup_old(self, days: int = 30):
         """Remove entries older than N days to keep the DB small."""
-        cutoff = datetime.now(timezone.utc)
-        from datetime import timedelta
-        cutoff = (cutoff - timedelta(days=days)).isoformat()
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.execute(
                 "DELETE FROM seen_articles WHERE sent_at < ?",
                 (cutoff,),
             )
             deleted = cursor.rowcount
-            conn.commit()
 
         if deleted:
+            self._seen = self._load_seen()
             logger.info(f"Cleaned up {deleted} articles older than {days} days")
 
     def stats(self) -> dict:
         """Get statistics about tracked articles."""
-        with sqlite3.connect(self.db_path) as conn:
-            total = conn.execute(
-                "SELECT COUNT(*) FROM seen_articles"
-            ).fetchone()[0]
-            recent = conn.execute(
-                "SELECT COUNT(*) FROM seen_articles WHERE sent_at > datetime('now', '-1 day')"
-            ).fetchone()[0]
+        # The in-memory hash set mirrors the table, so no full COUNT(*) scan
+        total = len(self._seen)
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+        recent = self._conn.execute(
+            "SELECT COUNT(*) FROM seen_articles WHERE sent_at > ?",
+            (cutoff,),
+        ).fetchone()[0]
         return {"total_tracked": total, "sent_last_24h": recent}
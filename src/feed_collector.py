@@ -8,20 +8,46 @@ Handles:
 - Graceful error handling for unavailable feeds
 """
 
+import json
 import logging
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
 from urllib.parse import quote_plus
 
 import feedparser
 import requests
+import urllib3
+import xxhash
 import yaml
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
 # Timeout for feed requests (seconds)
 REQUEST_TIMEOUT = 15
 
+# HTML stripping and title normalization
+_TAG_RE = re.compile(r"<[^>]+>")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_WS_RE = re.compile(r"\s+")
+
+# Titles must share this many normalized leading chars to count as duplicates
+TITLE_PREFIX_LENGTH = 60
+
+# Reading a streamed body can raise urllib3 errors that requests doesn't wrap
+FETCH_ERRORS = (requests.RequestException, urllib3.exceptions.HTTPError)
+
+# Last fetched body + ETag/Last-Modified per feed, for conditional GETs
+FEED_CACHE_DIR = "data/feed_cache"
+ETAG_INDEX_NAME = "etags.json"
+
+# Max feeds fetched concurrently
+MAX_FETCH_WORKERS = 16
+
 # User-Agent to avoid being blocked by some feeds
 USER_AGENT = (
     "Mozilla/5.0 (compatible; NewsBot/1.0; "
@@ -32,6 +58,19 @@ USER_AGENT = (
 class Article:
     """Represents a single news article collected from a feed."""
 
+    # Fixed attribute layout: no per-instance __dict__. The last two are
+    # filled in by KeywordFilter for articles that pass.
+    __slots__ = (
+        "title",
+        "link",
+        "description",
+        "published",
+        "source_name",
+        "source_category",
+        "relevance_score",
+        "matched_keywords",
+    )
+
     def __init__(
         self,
         title: str,
@@ -46,7 +85,8 @@ class Article:
         self.description = description.strip() if description else ""
         self.published = published
         self.source_name = source_name
-        self.source_category = source_category
+        # Normalized once here so consumers can read the attribute directly
+        self.source_category = source_category or "google_news"
 
     @property
     def published_str(self) -> str:
@@ -62,9 +102,16 @@ class Article:
 class FeedCollector:
     """Collects articles from all configured RSS feed sources."""
 
-    def __init__(self, sources_path: str = "config/sources.yaml"):
+    def __init__(
+        self,
+        sources_path: str = "config/sources.yaml",
+        cache_dir: str = FEED_CACHE_DIR,
+    ):
         self.sources_path = sources_path
         self.sources = self._load_sources()
+        self.session = self._build_session()
+        self.cache_dir = Path(cache_dir)
+        self.etag_cache = self._load_etag_cache()
 
     def _load_sources(self) -> dict:
         """Load feed sources from YAML config."""
@@ -75,33 +122,147 @@ class FeedCollector:
             logger.error(f"Sources config not found: {self.sources_path}")
             return {}
 
+    def _load_etag_cache(self) -> dict[str, dict]:
+        """Load cached ETag/Last-Modified validators, keyed by feed URL."""
+        index_path = self.cache_dir / ETAG_INDEX_NAME
+        try:
+            with open(index_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable feed cache {index_path}: {e}")
+            return {}
+
+    def _save_etag_cache(self, feed_urls: Optional[Iterable[str]] = None):
+        """
+        Persist feed validators for the next run's conditional GETs.
+
+        If `feed_urls` is given, entries and stored bodies for any other
+        feed (removed from sources.yaml, changed Google News query) are
+        dropped, so the cache doesn't grow forever.
+        """
+        if feed_urls is not None:
+            self._prune_etag_cache(set(feed_urls))
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_dir / ETAG_INDEX_NAME, "w") as f:
+                json.dump(self.etag_cache, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Failed to save feed cache: {e}")
+
+    def _prune_etag_cache(self, feed_urls: set[str]):
+        """Forget cached validators and bodies of feeds not in `feed_urls`."""
+        self.etag_cache = {
+            url: entry for url, entry in self.etag_cache.items() if url in feed_urls
+        }
+        keep = {self._cached_body_path(url).name for url in feed_urls}
+        if not self.cache_dir.is_dir():
+            return
+        # Leftover .tmp files are from interrupted downloads; none are live now
+        stale = [p for p in self.cache_dir.glob("*.xml") if p.name not in keep]
+        stale.extend(self.cache_dir.glob("*.tmp"))
+        for path in stale:
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.debug(f"Could not remove stale cache file {path}: {e}")
+
+    def _cached_body_path(self, feed_url: str) -> Path:
+        """Where the last fetched body of a feed is stored."""
+        return self.cache_dir / f"{xxhash.xxh3_64_hexdigest(feed_url.encode('utf-8'))}.xml"
+
+    def _build_session(self) -> requests.Session:
+        """Create a pooled session so feeds on the same host reuse connections."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=2)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        return session
+
+    def close(self):
+        """Close pooled HTTP connections."""
+        self.session.close()
+
+    def _fetch_feed(self, feed_url: str, verify: bool) -> feedparser.FeedParserDict:
+        """
+        GET a feed, sending the cached validators when we have them.
+
+        On 304 Not Modified the previously stored body is parsed again, so
+        articles still inside the age window are not lost from the digest.
+        """
+        body_path = self._cached_body_path(feed_url)
+        cached = self.etag_cache.get(feed_url)
+        headers = {}
+        if cached and body_path.exists():
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("modified"):
+                headers["If-Modified-Since"] = cached["modified"]
+
+        with self.session.get(
+            feed_url,
+            timeout=REQUEST_TIMEOUT,
+            headers=headers,
+            verify=verify,
+            stream=True,
+        ) as response:
+            if response.status_code == 304 and headers:
+                try:
+                    content = body_path.read_bytes()
+                    logger.debug(f"Not modified, using cached copy: {feed_url}")
+                    return feedparser.parse(content)
+                except OSError:
+                    # Cached copy vanished; fall back to an unconditional GET
+                    self.etag_cache.pop(feed_url, None)
+                    return self._fetch_feed(feed_url, verify)
+
+            response.raise_for_status()
+
+            etag = response.headers.get("ETag")
+            modified = response.headers.get("Last-Modified")
+            if not (etag or modified):
+                self.etag_cache.pop(feed_url, None)
+                return feedparser.parse(response.content)
+
+            # Copy the body straight from the socket into the cache file
+            # (decompressed), then parse it from disk; feedparser reads the
+            # whole document either way
+            response.raw.decode_content = True
+            tmp_path = body_path.with_suffix(".tmp")
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    shutil.copyfileobj(response.raw, f)
+                tmp_path.replace(body_path)
+            except OSError as e:
+                logger.warning(f"Could not cache {feed_url}: {e}")
+                self.etag_cache.pop(feed_url, None)
+                tmp_path.unlink(missing_ok=True)
+                return feedparser.FeedParserDict()
+            except FETCH_ERRORS:
+                # Connection dropped mid-body; don't leave a partial file
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+        self.etag_cache[feed_url] = {"etag": etag, "modified": modified}
+        with open(body_path, "rb") as f:
+            return feedparser.parse(f)
+
     def _parse_feed(self, feed_url: str) -> feedparser.FeedParserDict:
         """Fetch and parse a single RSS/Atom feed."""
         try:
-            response = requests.get(
-                feed_url,
-                timeout=REQUEST_TIMEOUT,
-                headers={"User-Agent": USER_AGENT},
-                verify=True,
-            )
-            response.raise_for_status()
-            return feedparser.parse(response.content)
+            return self._fetch_feed(feed_url, verify=True)
         except requests.exceptions.SSLError:
             # Some government sites have SSL issues; retry without verify
             logger.warning(f"SSL error for {feed_url}, retrying without verification")
             try:
-                response = requests.get(
-                    feed_url,
-                    timeout=REQUEST_TIMEOUT,
-                    headers={"User-Agent": USER_AGENT},
-                    verify=False,
-                )
-                response.raise_for_status()
-                return feedparser.parse(response.content)
-            except requests.RequestException as e:
+                return self._fetch_feed(feed_url, verify=False)
+            except FETCH_ERRORS as e:
                 logger.warning(f"Failed to fetch feed {feed_url}: {e}")
                 return feedparser.FeedParserDict()
-        except requests.RequestException as e:
+        except FETCH_ERRORS as e:
             logger.warning(f"Failed to fetch feed {feed_url}: {e}")
             return feedparser.FeedParserDict()
 
@@ -144,9 +305,7 @@ class FeedCollector:
                 description = entry["description"]
 
             # Clean HTML tags from description (simple approach)
-            import re
-            description = re.sub(r"<[^>]+>", " ", description)
-            description = re.sub(r"\s+", " ", description).strip()
+            description = _WS_RE.sub(" ", _TAG_RE.sub(" ", description)).strip()
 
             article = Article(
                 title=entry.get("title", "No title"),
@@ -162,148 +321,134 @@ class FeedCollector:
 
         return articles
 
-    def collect_government_feeds(self, max_age_hours: int = 48) -> list[Article]:
-        """Collect articles from government RSS feeds."""
-        articles = []
-        sources = self.sources.get("government", [])
+    def _feed_specs(
+        self, key: str, default_category: str
+    ) -> list[tuple[str, str, str]]:
+        """Build (name, feed_url, category) triples for one source list."""
+        return [
+            (
+                source["name"],
+                source["feed_url"],
+                source.get("category", default_category),
+            )
+            for source in self.sources.get(key) or []
+        ]
 
-        for source in sources:
-            name = source["name"]
-            feed_url = source["feed_url"]
-            category = source.get("category", "government")
+    def _google_news_specs(self) -> list[tuple[str, str, str]]:
+        """Build (name, feed_url, category) triples for Google News queries."""
+        queries = self.sources.get("google_news_queries", [])
+        base_url = self.sources.get(
+            "google_news_base_url",
+            "https://news.google.com/rss/search?q={query}&hl=en-CA&gl=CA&ceid=CA:en",
+        )
+        return [
+            (
+                f"Google News - {q['label']}",
+                base_url.format(query=quote_plus(q["query"])),
+                "google_news",
+            )
+            for q in queries
+        ]
 
-            logger.info(f"Fetching: {name}")
-            feed = self._parse_feed(feed_url)
+    def _fetch_feeds(
+        self, feed_urls: list[str]
+    ) -> Iterator[feedparser.FeedParserDict]:
+        """
+        Fetch and parse feeds concurrently, yielding them in input order.
+
+        Each parsed feed is released once the caller moves on, rather than
+        holding every feed in memory until the last one has been processed.
+        """
+        if not feed_urls:
+            return
+        workers = min(MAX_FETCH_WORKERS, len(feed_urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(self._parse_feed, feed_urls)
+
+    def _iter_articles(
+        self, specs: list[tuple[str, str, str]], max_age_hours: int = 48
+    ) -> Iterator[Article]:
+        """Fetch every feed in `specs` at once, then yield their articles."""
+        logger.info(f"Fetching {len(specs)} feeds...")
+        feeds = self._fetch_feeds([feed_url for _, feed_url, _ in specs])
+
+        for (name, _, category), feed in zip(specs, feeds):
             new_articles = self._extract_articles(
                 feed, name, category, max_age_hours
             )
-            articles.extend(new_articles)
             logger.info(f"  -> {len(new_articles)} articles from {name}")
+            yield from new_articles
 
+    def _collect(
+        self, specs: list[tuple[str, str, str]], max_age_hours: int = 48
+    ) -> list[Article]:
+        """Fetch every feed in `specs` at once, then extract their articles."""
+        articles = list(self._iter_articles(specs, max_age_hours))
+        # Only one tier's feeds are known here, so nothing is pruned
+        self._save_etag_cache()
         return articles
 
+    def collect_government_feeds(self, max_age_hours: int = 48) -> list[Article]:
+        """Collect articles from government RSS feeds."""
+        return self._collect(
+            self._feed_specs("government", "government"), max_age_hours
+        )
+
     def collect_think_tank_feeds(self, max_age_hours: int = 48) -> list[Article]:
         """Collect articles from think tank RSS feeds."""
-        articles = []
-        sources = self.sources.get("think_tanks", [])
-
-        for source in sources:
-            name = source["name"]
-            feed_url = source["feed_url"]
-            category = source.get("category", "think_tank")
-
-            logger.info(f"Fetching: {name}")
-            feed = self._parse_feed(feed_url)
-            new_articles = self._extract_articles(
-                feed, name, category, max_age_hours
-            )
-            articles.extend(new_articles)
-            logger.info(f"  -> {len(new_articles)} articles from {name}")
-
-        return articles
+        return self._collect(
+            self._feed_specs("think_tanks", "think_tank"), max_age_hours
+        )
 
     def collect_media_feeds(self, max_age_hours: int = 48) -> list[Article]:
         """Collect articles from Canadian media RSS feeds (CBC, CTV, etc.)."""
-        articles = []
-        sources = self.sources.get("media", [])
-
-        for source in sources:
-            name = source["name"]
-            feed_url = source["feed_url"]
-            category = source.get("category", "google_news")
-
-            logger.info(f"Fetching: {name}")
-            feed = self._parse_feed(feed_url)
-            new_articles = self._extract_articles(
-                feed, name, category, max_age_hours
-            )
-            articles.extend(new_articles)
-            logger.info(f"  -> {len(new_articles)} articles from {name}")
-
-        return articles
+        return self._collect(
+            self._feed_specs("media", "google_news"), max_age_hours
+        )
 
     def collect_google_news_feeds(self, max_age_hours: int = 48) -> list[Article]:
         """Collect articles from Google News RSS keyword searches."""
-        articles = []
-        queries = self.sources.get("google_news_queries", [])
-        base_url = self.sources.get(
-            "google_news_base_url",
-            "https://news.google.com/rss/search?q={query}&hl=en-CA&gl=CA&ceid=CA:en",
-        )
-
-        for q in queries:
-            query = q["query"]
-            label = q["label"]
-            feed_url = base_url.format(query=quote_plus(query))
-
-            logger.info(f"Google News: {label}")
-            feed = self._parse_feed(feed_url)
-            new_articles = self._extract_articles(
-                feed, f"Google News - {label}", "google_news", max_age_hours
-            )
-            articles.extend(new_articles)
-            logger.info(f"  -> {len(new_articles)} articles for '{label}'")
-
-        return articles
+        return self._collect(self._google_news_specs(), max_age_hours)
 
     def collect_linkedin_feeds(self, max_age_hours: int = 48) -> list[Article]:
         """Collect articles from LinkedIn RSS.app feeds (if configured)."""
-        articles = []
-        sources = self.sources.get("linkedin_rss", [])
-
-        if not sources:
+        specs = self._feed_specs("linkedin_rss", "linkedin")
+        if not specs:
             logger.info("No LinkedIn RSS feeds configured (Tier 3 - optional)")
-            return articles
+            return []
+        return self._collect(specs, max_age_hours)
 
-        for source in sources:
-            name = source["name"]
-            feed_url = source["feed_url"]
-            category = source.get("category", "linkedin")
-
-            logger.info(f"Fetching LinkedIn: {name}")
-            feed = self._parse_feed(feed_url)
-            new_articles = self._extract_articles(
-                feed, name, category, max_age_hours
-            )
-            articles.extend(new_articles)
-            logger.info(f"  -> {len(new_articles)} articles from {name}")
-
-        return articles
-
-    def _deduplicate_by_title(self, articles: list[Article]) -> list[Article]:
+    def _deduplicate_by_title(self, articles: Iterable[Article]) -> list[Article]:
         """
         Remove duplicate articles that appear from multiple sources.
         Uses normalized title similarity to catch the same article
         found by different Google News queries.
         """
-        seen_titles = {}
+        seen_prefixes: dict[str, Article] = {}
         unique = []
+        total = 0
 
         for article in articles:
+            total += 1
             # Normalize: lowercase, strip punctuation, collapse spaces
-            import re
-            normalized = re.sub(r"[^\w\s]", "", article.title.lower())
-            normalized = re.sub(r"\s+", " ", normalized).strip()
-
-            # Check if we've seen a very similar title
-            is_dup = False
-            for seen_norm, seen_article in seen_titles.items():
-                # If titles share first 60 chars (normalized), it's a duplicate
-                if (
-                    len(normalized) > 20
-                    and len(seen_norm) > 20
-                    and normalized[:60] == seen_norm[:60]
-                ):
-                    is_dup = True
-                    break
-
-            if not is_dup:
-                seen_titles[normalized] = article
+            normalized = _PUNCT_RE.sub("", article.title.lower())
+            normalized = _WS_RE.sub(" ", normalized).strip()
+
+            # Very short titles are too generic to compare
+            if len(normalized) <= 20:
                 unique.append(article)
-            else:
+                continue
+
+            # If titles share the first 60 chars (normalized), it's a duplicate
+            prefix = normalized[:TITLE_PREFIX_LENGTH]
+            if prefix in seen_prefixes:
                 logger.debug(f"Cross-source duplicate removed: {article.title[:50]}...")
+                continue
 
-        removed = len(articles) - len(unique)
+            seen_prefixes[prefix] = article
+            unique.append(article)
+
+        removed = total - len(unique)
         if removed:
             logger.info(f"Removed {removed} cross-source duplicate(s)")
 
@@ -315,30 +460,43 @@ class FeedCollector:
         logger.info("Starting feed collection...")
         logger.info("=" * 60)
 
-        all_articles = []
+        # Gather every feed first so all tiers are fetched concurrently
+        specs = []
 
         # Tier 1: Government feeds
-        logger.info("\n--- Government Sources ---")
-        all_articles.extend(self.collect_government_feeds(max_age_hours))
+        government = self._feed_specs("government", "government")
+        logger.info(f"Government sources: {len(government)} feeds")
+        specs.extend(government)
 
         # Tier 1: Think tanks
-        logger.info("\n--- Think Tanks ---")
-        all_articles.extend(self.collect_think_tank_feeds(max_age_hours))
+        think_tanks = self._feed_specs("think_tanks", "think_tank")
+        logger.info(f"Think tanks: {len(think_tanks)} feeds")
+        specs.extend(think_tanks)
 
         # Tier 1: Canadian media
-        logger.info("\n--- Canadian Media ---")
-        all_articles.extend(self.collect_media_feeds(max_age_hours))
+        media = self._feed_specs("media", "google_news")
+        logger.info(f"Canadian media: {len(media)} feeds")
+        specs.extend(media)
 
         # Tier 2: Google News keyword feeds
-        logger.info("\n--- Google News Queries ---")
-        all_articles.extend(self.collect_google_news_feeds(max_age_hours))
+        google_news = self._google_news_specs()
+        logger.info(f"Google News queries: {len(google_news)} feeds")
+        specs.extend(google_news)
 
         # Tier 3: LinkedIn (optional)
-        logger.info("\n--- LinkedIn Feeds ---")
-        all_articles.extend(self.collect_linkedin_feeds(max_age_hours))
+        linkedin = self._feed_specs("linkedin_rss", "linkedin")
+        if linkedin:
+            logger.info(f"LinkedIn feeds: {len(linkedin)} feeds")
+        else:
+            logger.info("No LinkedIn RSS feeds configured (Tier 3 - optional)")
+        specs.extend(linkedin)
 
         # Remove cross-source duplicates (same article from multiple queries)
-        all_articles = self._deduplicate_by_title(all_articles)
+        # as articles stream out of the fetched feeds
+        all_articles = self._deduplicate_by_title(
+            self._iter_articles(specs, max_age_hours)
+        )
+        self._save_etag_cache(feed_url for _, feed_url, _ in specs)
 
         logger.info(f"\nTotal unique articles collected: {len(all_articles)}")
         return all_articles
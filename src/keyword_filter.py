@@ -16,13 +16,84 @@ Scoring:
 
 import logging
 import re
-from typing import Optional
+from typing import Iterable, Optional
 
+import ahocorasick
 import yaml
 
 logger = logging.getLogger(__name__)
 
 
+def _is_word_char(char: str) -> bool:
+    """Same definition of a word character as the regex `\\w` class."""
+    return char.isalnum() or char == "_"
+
+
+class _KeywordScanner:
+    """
+    Finds keywords from several groups in one Aho-Corasick pass.
+
+    All groups share a single automaton, so an article's text is walked
+    once (in C) no matter how many keywords or groups are configured.
+
+    Keywords use word-boundary matching so "defence" doesn't match
+    "defenceless" but still catches "defence," and "defence." etc.
+    """
+
+    def __init__(self, groups: dict[str, list[str]]):
+        self.groups = tuple(groups)
+
+        # One automaton entry per keyword, tagged with every group using it
+        kinds_by_keyword: dict[str, list[str]] = {}
+        for kind, keywords in groups.items():
+            for kw in keywords:
+                kinds_by_keyword.setdefault(kw, []).append(kind)
+
+        self._automaton = None
+        if kinds_by_keyword:
+            self._automaton = ahocorasick.Automaton()
+            for kw, kinds in kinds_by_keyword.items():
+                self._automaton.add_word(kw, (kw, tuple(kinds)))
+            self._automaton.make_automaton()
+
+    def scan(self, title: str, description: str) -> dict[str, tuple[set, set, set]]:
+        """
+        Scan already-lowercased title and description together.
+
+        Returns {group: (title_matches, description_matches, combined_matches)}
+        where combined also includes keywords spanning the title/description
+        join, matching a search over f"{title} {description}".
+        """
+        found = {kind: (set(), set(), set()) for kind in self.groups}
+        if self._automaton is None:
+            return found
+
+        text = f"{title} {description}"
+        split = len(title)
+        last = len(text) - 1
+
+        for end, (kw, kinds) in self._automaton.iter(text):
+            start = end - len(kw) + 1
+
+            # Enforce \b on both sides, exactly as r"\b" + kw + r"\b" would
+            before = start > 0 and _is_word_char(text[start - 1])
+            if before == _is_word_char(kw[0]):
+                continue
+            after = end < last and _is_word_char(text[end + 1])
+            if after == _is_word_char(kw[-1]):
+                continue
+
+            for kind in kinds:
+                title_hits, desc_hits, combined_hits = found[kind]
+                combined_hits.add(kw)
+                if end < split:
+                    title_hits.add(kw)
+                elif start > split:
+                    desc_hits.add(kw)
+
+        return found
+
+
 class KeywordFilter:
     """Filters articles using contextual relevance scoring."""
 
@@ -42,7 +113,22 @@ class KeywordFilter:
         self.negative_keywords = [
             kw.lower() for kw in self.config.get("negative_keywords", [])
         ]
-        self.trusted_categories = self.config.get("trusted_categories", [])
+        self.trusted_categories = frozenset(
+            self.config.get("trusted_categories", [])
+        )
+
+        # Negative keywords are plain substrings; one search covers them all
+        self._negative_re = None
+        if self.negative_keywords:
+            self._negative_re = re.compile(
+                "|".join(re.escape(kw) for kw in self.negative_keywords)
+            )
+
+        self._scanner = _KeywordScanner({
+            "primary": self.primary_keywords,
+            "canada": self.canada_keywords,
+            "context": self.context_keywords,
+        })
 
         scoring = self.config.get("scoring", {})
         self.title_multiplier = scoring.get("title_multiplier", 3)
@@ -59,34 +145,14 @@ class KeywordFilter:
             logger.error(f"Keywords config not found: {self.keywords_path}")
             return {}
 
-    def _count_keyword_matches(
-        self, text: str, keywords: list[str]
-    ) -> tuple[int, list[str]]:
-        """
-        Count how many keywords appear in the text.
-
-        Returns:
-            (count, list_of_matched_keywords)
-        """
-        text_lower = text.lower()
-        matched = []
-        count = 0
-        for kw in keywords:
-            # Use word boundary matching so "defence" doesn't match "defenceless"
-            # but still catches "defence," and "defence." etc.
-            pattern = r'\b' + re.escape(kw) + r'\b'
-            if re.search(pattern, text_lower):
-                matched.append(kw)
-                count += 1
-        return count, matched
-
     def _has_negative_keywords(self, title: str, description: str) -> bool:
-        """Check if article contains disqualifying negative keywords."""
-        combined = f"{title} {description}".lower()
-        for neg_kw in self.negative_keywords:
-            if neg_kw in combined:
-                logger.debug(f"Negative keyword '{neg_kw}' found, excluding article")
-                return True
+        """Check if (lowercased) article text contains negative keywords."""
+        if self._negative_re is None:
+            return False
+        match = self._negative_re.search(f"{title} {description}")
+        if match:
+            logger.debug(f"Negative keyword '{match.group()}' found, excluding article")
+            return True
         return False
 
     def score_article(self, article) -> dict:
@@ -100,10 +166,19 @@ class KeywordFilter:
         - matched_context: list of matched context keywords
         - reason: human-readable explanation
         """
-        title = article.title
-        description = article.description
-        category = article.source_category
+        return self._score_text(
+            article.title.lower(),
+            article.description.lower(),
+            article.source_category,
+        )
+
+    def _score_text(self, title: str, description: str, category: str) -> dict:
+        """
+        Score already-lowercased article text (see `score_article`).
 
+        Every keyword check below works on the lowered strings, so callers
+        scoring many articles lowercase each field exactly once.
+        """
         # Step 1: Check negative keywords (instant disqualification)
         if self._has_negative_keywords(title, description):
             return {
@@ -114,22 +189,15 @@ class KeywordFilter:
                 "reason": "Excluded by negative keyword",
             }
 
-        # Step 2: Count primary keyword matches in title and description
-        title_primary_count, title_primary_matched = self._count_keyword_matches(
-            title, self.primary_keywords
-        )
-        desc_primary_count, desc_primary_matched = self._count_keyword_matches(
-            description, self.primary_keywords
-        )
-
-        all_primary_matched = list(
-            set(title_primary_matched + desc_primary_matched)
-        )
+        # Step 2: Find primary, Canada and context keywords in one pass
+        found = self._scanner.scan(title, description)
+        title_primary, desc_primary, _ = found["primary"]
+        all_primary_matched = list(title_primary | desc_primary)
 
         # Step 3: Calculate primary score
         primary_score = (
-            title_primary_count * self.title_multiplier
-            + desc_primary_count * self.desc_multiplier
+            len(title_primary) * self.title_multiplier
+            + len(desc_primary) * self.desc_multiplier
         )
 
         # Step 4: If no primary keywords matched, the article is not relevant
@@ -153,10 +221,7 @@ class KeywordFilter:
         context_matched = []
         if not is_trusted:
             # 6a: Article MUST mention Canada specifically
-            combined_text = f"{title} {description}"
-            _, canada_matched = self._count_keyword_matches(
-                combined_text, self.canada_keywords
-            )
+            _, _, canada_matched = found["canada"]
             if not canada_matched:
                 return {
                     "score": primary_score,
@@ -167,13 +232,8 @@ class KeywordFilter:
                 }
 
             # 6b: Also need domain context keywords
-            _, title_context = self._count_keyword_matches(
-                title, self.context_keywords
-            )
-            _, desc_context = self._count_keyword_matches(
-                description, self.context_keywords
-            )
-            context_matched = list(set(title_context + desc_context))
+            title_context, desc_context, _ = found["context"]
+            context_matched = list(title_context | desc_context)
 
             if not context_matched:
                 return {
@@ -210,44 +270,45 @@ class KeywordFilter:
             "reason": reason,
         }
 
-    def filter_articles(self, articles: list) -> list:
+    def filter_articles(self, articles: Iterable) -> list:
         """
-        Filter a list of articles, returning only relevant ones.
+        Filter articles (any iterable), returning only relevant ones.
 
         Each returned article gets an additional `relevance` attribute
         with scoring details.
         """
         relevant = []
-        total = len(articles)
+        total = 0
         passed_count = 0
 
+        # Decide once per batch instead of formatting a debug line per article
+        debug = logger.isEnabledFor(logging.DEBUG)
+
         for article in articles:
-            result = self.score_article(article)
+            total += 1
+            # Lowercase each field once; nothing is kept beyond this article
+            result = self._score_text(
+                article.title.lower(),
+                article.description.lower(),
+                article.source_category,
+            )
 
             if result["passed"]:
                 article.relevance_score = result["score"]
                 article.matched_keywords = result["matched_primary"]
                 relevant.append(article)
                 passed_count += 1
-                logger.debug(
-                    f"  PASS [{result['score']}]: {article.title[:60]}... "
-                    f"({result['reason']})"
-                )
-            else:
+                if debug:
+                    logger.debug(
+                        f"  PASS [{result['score']}]: {article.title[:60]}... "
+                        f"({result['reason']})"
+                    )
+            elif debug:
                 logger.debug(
                     f"  SKIP: {article.title[:60]}... ({result['reason']})"
                 )
 
-        # Sort by relevance score (highest first), then by date
-        relevant.sort(
-            key=lambda a: (
-                -a.relevance_score,
-                a.published or datetime_min(),
-            ),
-            reverse=False,
-        )
-
-        # Re-sort: highest score first, and within same score, newest first
+        # Highest score first, and within same score, newest first
         relevant.sort(
             key=lambda a: (
                 -a.relevance_score,
@@ -262,8 +323,3 @@ class KeywordFilter:
 
         return relevant
 
-
-def datetime_min():
-    """Return a minimal datetime for sorting fallback."""
-    from datetime import datetime, timezone
-    return datetime(2000, 1, 1, tzinfo=timezone.utc)
@@ -19,37 +19,46 @@ import os
 import sys
 import time
 from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
-import schedule
-from dotenv import load_dotenv
-
 # Ensure we can import from the project root
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.feed_collector import FeedCollector
-from src.keyword_filter import KeywordFilter
 from src.dedup import DedupTracker
-from src.teams_sender import TeamsSender
+
+# The collector, filter and sender (feedparser, requests, ahocorasick,
+# orjson), schedule and dotenv are imported where they're used, so
+# `--stats` starts without loading any of them.
 
 # ---------------------------------------------------------------------------
 # Logging setup
 # ---------------------------------------------------------------------------
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOG_FILE = "data/newsbot.log"
+LOG_MAX_BYTES = 5_000_000
+LOG_BACKUP_COUNT = 3
 
 
-def setup_logging(verbose: bool = False):
-    """Configure logging with optional verbose mode."""
+def setup_logging(verbose: bool = False, log_to_file: bool = True):
+    """Configure logging with optional verbose mode and log file."""
     level = logging.DEBUG if verbose else logging.INFO
+    handlers = [logging.StreamHandler(sys.stdout)]
+
+    if log_to_file:
+        # Size-bounded log file, rotated instead of growing forever
+        Path(LOG_FILE).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+        )
+        handlers.append(file_handler)
+
     logging.basicConfig(
         level=level,
         format=LOG_FORMAT,
         datefmt=LOG_DATE_FORMAT,
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler("data/newsbot.log", mode="a"),
-        ],
+        handlers=handlers,
     )
     # Quiet down noisy libraries
     logging.getLogger("urllib3").setLevel(logging.WARNING)
@@ -76,6 +85,10 @@ def run_pipeline(
     Returns:
         Number of articles sent
     """
+    from src.feed_collector import FeedCollector
+    from src.keyword_filter import KeywordFilter
+    from src.teams_sender import TeamsSender
+
     logger = logging.getLogger("newsbot.pipeline")
 
     logger.info("=" * 60)
@@ -85,10 +98,23 @@ def run_pipeline(
     logger.info(f"Max article age: {max_age_hours} hours")
     logger.info("=" * 60)
 
+    if not webhook_url and not dry_run:
+        logger.error(
+            "No TEAMS_WEBHOOK_URL configured! "
+            "Set it in .env or pass --dry-run to preview."
+        )
+        # Still show a preview even without webhook
+        dry_run = True
+
+    # Built first so a malformed webhook URL fails before any fetching.
+    # A dry run never posts, so it doesn't depend on the URL at all.
+    sender = TeamsSender(webhook_url="" if dry_run else webhook_url)
+
     # Step 1: Collect feeds
     logger.info("\nStep 1/4: Collecting feeds...")
     collector = FeedCollector()
     all_articles = collector.collect_all(max_age_hours=max_age_hours)
+    collector.close()
 
     if not all_articles:
         logger.warning("No articles collected from any source!")
@@ -97,6 +123,7 @@ def run_pipeline(
     logger.info("\nStep 2/4: Applying keyword filter...")
     kw_filter = KeywordFilter()
     relevant_articles = kw_filter.filter_articles(all_articles)
+    del all_articles  # Release the articles that didn't pass the filter
 
     # Step 3: Deduplication
     logger.info("\nStep 3/4: Deduplicating...")
@@ -105,27 +132,25 @@ def run_pipeline(
 
     # Step 4: Send to Teams
     logger.info(f"\nStep 4/4: Sending {len(new_articles)} articles to Teams...")
+    success, delivered = sender.send_digest(new_articles, dry_run=dry_run)
+    sender.close()
 
-    if not webhook_url and not dry_run:
-        logger.error(
-            "No TEAMS_WEBHOOK_URL configured! "
-            "Set it in .env or pass --dry-run to preview."
-        )
-        # Still show a preview even without webhook
-        dry_run = True
-
-    sender = TeamsSender(webhook_url=webhook_url)
-    success = sender.send_digest(new_articles, dry_run=dry_run)
-
-    if success and not dry_run:
-        # Mark articles as sent
-        dedup.mark_batch_seen(new_articles)
-        logger.info(f"Marked {len(new_articles)} articles as sent")
-    elif dry_run:
+    if dry_run:
         logger.info("Dry run complete - no articles marked as sent")
+    elif delivered:
+        # Mark only what Teams accepted; if a later part of the digest
+        # failed, its articles are sent again next run (and only those)
+        marked = dedup.mark_batch_seen(delivered)
+        logger.info(f"Marked {marked} articles as sent")
+    if not success and new_articles:
+        logger.warning(
+            f"{len(new_articles) - len(delivered)} articles not delivered; "
+            "they will be retried next run"
+        )
 
     # Periodic cleanup of old entries
     dedup.cleanup_old(days=30)
+    dedup.close()
 
     logger.info(f"\nPipeline complete. {len(new_articles)} new articles processed.")
     return len(new_articles)
@@ -134,11 +159,26 @@ def run_pipeline(
 # ---------------------------------------------------------------------------
 # Scheduler
 # ---------------------------------------------------------------------------
-def run_scheduled(schedule_time: str = "07:00", dry_run: bool = False):
+# Longest the scheduler sleeps between checks (seconds)
+MAX_SCHEDULER_SLEEP = 3600
+
+
+def run_scheduled(
+    schedule_time: str = "07:00",
+    dry_run: bool = False,
+    webhook_url: str = "",
+):
     """Run the pipeline on a daily schedule."""
+    import schedule
+
     logger = logging.getLogger("newsbot.scheduler")
 
-    webhook_url = os.getenv("TEAMS_WEBHOOK_URL", "")
+    # Refuse to start a long-running scheduler on a bad URL; each job
+    # would otherwise fail the same way, once a day
+    if webhook_url and not dry_run:
+        from src.teams_sender import validate_webhook_url
+
+        validate_webhook_url(webhook_url)
 
     logger.info(f"Scheduling daily run at {schedule_time} (local time)")
     logger.info("Press Ctrl+C to stop.\n")
@@ -156,9 +196,14 @@ def run_scheduled(schedule_time: str = "07:00", dry_run: bool = False):
     logger.info("Running initial collection now...")
     job()
 
+    # Sleep until the next run is due instead of polling every minute.
+    # Capped so a wall-clock jump (suspend, DST) is noticed within the hour.
     while True:
+        idle = schedule.idle_seconds()
+        if idle is None:
+            break  # No jobs left
+        time.sleep(min(max(idle, 1), MAX_SCHEDULER_SLEEP))
         schedule.run_pending()
-        time.sleep(60)  # Check every minute
 
 
 # ---------------------------------------------------------------------------
@@ -166,8 +211,6 @@ def run_scheduled(schedule_time: str = "07:00", dry_run: bool = False):
 # ---------------------------------------------------------------------------
 def main():
     """Command-line interface for NewsBot."""
-    load_dotenv()
-
     parser = argparse.ArgumentParser(
         description="NewsBot - Canadian Defence & Sovereignty News Aggregator",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -213,26 +256,30 @@ Examples:
 
     args = parser.parse_args()
 
-    # Setup logging
-    setup_logging(verbose=args.verbose)
-
-    # Ensure data directory exists
-    Path("data").mkdir(exist_ok=True)
+    # Setup logging (--stats is read-only and doesn't touch the log file)
+    setup_logging(verbose=args.verbose, log_to_file=not args.stats)
 
     if args.stats:
         dedup = DedupTracker()
         stats = dedup.stats()
+        dedup.close()
         print(f"\nNewsBot Database Stats:")
         print(f"  Total articles tracked: {stats['total_tracked']}")
         print(f"  Sent in last 24 hours:  {stats['sent_last_24h']}")
         return
 
+    # Only the pipeline needs .env (stats above doesn't)
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
     webhook_url = os.getenv("TEAMS_WEBHOOK_URL", "")
 
     if args.schedule:
         run_scheduled(
             schedule_time=args.schedule,
             dry_run=args.dry_run,
+            webhook_url=webhook_url,
         )
     else:
         run_pipeline(
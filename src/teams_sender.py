@@ -5,176 +5,318 @@ Uses Teams Workflows webhook to POST Adaptive Cards.
 Uses compatible elements only (no Container emphasis/bleed).
 """
 
+import copy
 import logging
+import sys
+import time
+from collections import defaultdict
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import chain, count, groupby
+from typing import Iterator, Optional
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+except ImportError:
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
 
 logger = logging.getLogger(__name__)
 
+# Articles per card; larger digests are split into several sequential posts
 MAX_ARTICLES_PER_MESSAGE = 30
+# Pause between the posts of a multi-part digest (webhook throttling)
+PART_POST_INTERVAL = 0.25
 MAX_TITLE_LENGTH = 150
+DIGEST_DATE_FORMAT = "%A, %B %d, %Y"
+
+_UTC = timezone.utc
+
+# Display order of known source categories within a digest
+_CATEGORY_ORDER = ("government", "think_tank", "google_news", "linkedin")
+
+# Category labels with emoji indicators
+_CATEGORY_LABELS = {
+    "government": "\U0001F3DB\uFE0F  Government Sources",
+    "think_tank": "\U0001F4D6  Research & Analysis",
+    "google_news": "\U0001F4F0  News & Media",
+    "linkedin": "\U0001F4BC  LinkedIn",
+}
+
+# Prefix FeedCollector puts on Google News query sources
+_GOOGLE_NEWS_PREFIX = "Google News - "
+
+# Constant card blocks, shared by every card (never mutated)
+_TITLE_BLOCK = {
+    "type": "TextBlock",
+    "text": "\U0001F6E1\uFE0F Defence & Sovereignty News",
+    "weight": "Bolder",
+    "size": "ExtraLarge",
+    "wrap": True,
+    "color": "Accent",
+}
+_FOOTER_RULE_BLOCK = {
+    "type": "TextBlock",
+    "text": "\u2500" * 35,
+    "isSubtle": True,
+    "spacing": "Large",
+    "size": "Small",
+}
+
+# Standard webhook envelope; "body" is filled in per card by _card_payload
+_CARD_SKELETON = {
+    "type": "message",
+    "attachments": [
+        {
+            "contentType": "application/vnd.microsoft.card.adaptive",
+            "contentUrl": None,
+            "content": {
+                "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
+                "type": "AdaptiveCard",
+                "version": "1.4",
+                "body": None,
+            },
+        }
+    ],
+}
+
+
+def _card_payload(body: list) -> dict:
+    """Wrap card body blocks in a fresh copy of the webhook envelope."""
+    payload = copy.deepcopy(_CARD_SKELETON)
+    payload["attachments"][0]["content"]["body"] = body
+    return payload
+
+
+@lru_cache(maxsize=256)
+def _truncate(text: str, limit: int = MAX_TITLE_LENGTH) -> str:
+    """Cut text to limit characters, marking the cut with an ellipsis."""
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def validate_webhook_url(webhook_url: str):
+    """
+    Raise ValueError unless webhook_url is an https URL with a host.
+
+    Only the scheme and host are reported: a Workflows URL carries its
+    `sig=` secret in the query string, which must not reach the logs.
+    """
+    parsed = urlparse(webhook_url)
+    if parsed.scheme != "https" or not parsed.hostname:
+        raise ValueError(
+            "Invalid Teams webhook URL (expected https://...): "
+            f"scheme={parsed.scheme!r}, host={parsed.hostname!r}"
+        )
 
 
 class TeamsSender:
     """Sends formatted news digests to a Microsoft Teams channel."""
 
     def __init__(self, webhook_url: str):
+        """
+        Args:
+            webhook_url: Teams Workflows webhook (https). May be empty for
+                dry-run use, in which case no HTTP session is created.
+
+        Raises:
+            ValueError: If a non-empty webhook_url is not an https URL.
+        """
+        if webhook_url:
+            validate_webhook_url(webhook_url)
         self.webhook_url = webhook_url
+        self._session = self._build_session() if webhook_url else None
+
+    def _build_session(self) -> requests.Session:
+        """
+        Create a pooled session that retries webhook posts only when safe.
+
+        A card POST is not idempotent, so it is retried only if Teams
+        cannot have acted on it: connection failures (nothing was sent)
+        and 429/503 throttling, which is answered before the flow runs
+        (honouring Retry-After). Read timeouts and 500/502/504 may come
+        after the card was posted, so they are never retried.
+        """
+        retry = Retry(
+            total=3,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=[429, 503],
+            allowed_methods=frozenset({"POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        session = requests.Session()
+        session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry),
+        )
+        return session
+
+    def close(self):
+        """Close pooled HTTP connections."""
+        if self._session is not None:
+            self._session.close()
 
     def _group_articles(self, articles: list) -> dict[str, list]:
         """Group articles by source category for organized display."""
-        groups = {
-            "government": [],
-            "think_tank": [],
-            "google_news": [],
-            "linkedin": [],
-        }
-
+        groups = defaultdict(list)
         for article in articles:
-            category = getattr(article, "source_category", "google_news")
-            if category not in groups:
-                groups[category] = []
-            groups[category].append(article)
+            groups[article.source_category].append(article)
 
-        return {k: v for k, v in groups.items() if v}
+        # Known categories first in display order, then any others as seen
+        order = [
+            *_CATEGORY_ORDER,
+            *(c for c in groups if c not in _CATEGORY_ORDER),
+        ]
+        return {c: groups[c] for c in order if c in groups}
 
     def _category_label(self, category: str) -> str:
         """Category labels with emoji indicators."""
-        labels = {
-            "government": "\U0001F3DB\uFE0F  Government Sources",
-            "think_tank": "\U0001F4D6  Research & Analysis",
-            "google_news": "\U0001F4F0  News & Media",
-            "linkedin": "\U0001F4BC  LinkedIn",
-        }
-        return labels.get(category, category.title())
+        return _CATEGORY_LABELS.get(category, category.title())
 
     def _clean_source(self, source_name: str) -> str:
         """Clean up source name for display."""
-        if source_name.startswith("Google News - "):
-            return source_name.replace("Google News - ", "")
-        return source_name
+        return source_name.removeprefix(_GOOGLE_NEWS_PREFIX)
 
-    def _build_adaptive_card(self, articles: list, date_str: str) -> dict:
-        """Build a polished Adaptive Card for Teams."""
-        body = []
-
-        # ── Header ──
-        body.append({
+    def _category_header_block(self, category: str) -> dict:
+        """Category header with separator line."""
+        return {
             "type": "TextBlock",
-            "text": "\U0001F6E1\uFE0F Defence & Sovereignty News",
+            "text": self._category_label(category),
             "weight": "Bolder",
-            "size": "ExtraLarge",
+            "size": "Medium",
+            "spacing": "ExtraLarge",
+            "separator": True,
             "wrap": True,
-            "color": "Accent",
-        })
-        body.append({
+        }
+
+    def _title_block(self, article, article_num: int, suffix: str = "") -> dict:
+        """A numbered, clickable article title."""
+        title = _truncate(article.title)
+        return {
             "type": "TextBlock",
-            "text": f"{date_str}",
+            "text": f"**{article_num}.** [{title}]({article.link}){suffix}",
+            "wrap": True,
+            "spacing": "Medium",
+            "size": "Default",
+        }
+
+    def _source_block(self, text: str, spacing: str = "None") -> dict:
+        """A subtle, indented source line."""
+        return {
+            "type": "TextBlock",
+            "text": f"\u2003\u2003{text}",
             "isSubtle": True,
-            "spacing": "None",
+            "spacing": spacing,
             "size": "Small",
-        })
-        body.append({
-            "type": "TextBlock",
-            "text": f"**{len(articles)}** new articles across Canadian defence & sovereignty topics",
             "wrap": True,
-            "spacing": "Small",
-            "size": "Small",
-        })
+        }
 
-        # ── Articles grouped by category ──
-        grouped = self._group_articles(articles)
-        article_num = 0
+    def _category_blocks(self, cat_articles: list, numbers: Iterator[int]) -> list[dict]:
+        """
+        Numbered article entries for one category section.
+
+        A lone article gets its title plus a subtle source/date line below.
+        Consecutive articles from the same source share one source line
+        above their titles (dates move inline), which keeps bursty-source
+        digests well under the Teams payload limit.
+        """
+        blocks = []
+        runs = groupby(cat_articles, key=lambda a: self._clean_source(a.source_name))
+        for source, run in runs:
+            run = list(run)
+            if len(run) == 1:
+                article = run[0]
+                date_part = f" \u2022 {article.published_str}" if article.published else ""
+                blocks.append(self._title_block(article, next(numbers)))
+                blocks.append(self._source_block(f"{source}{date_part}"))
+                continue
 
-        for category, cat_articles in grouped.items():
-            # Category header with separator line
-            body.append({
+            blocks.append(self._source_block(source, spacing="Medium"))
+            for article in run:
+                date_part = f" \u2022 {article.published_str}" if article.published else ""
+                blocks.append(self._title_block(article, next(numbers), date_part))
+        return blocks
+
+    def _build_adaptive_card(
+        self,
+        articles: list,
+        date_str: str,
+        part: tuple[int, int] = (1, 1),
+        total: Optional[int] = None,
+    ) -> dict:
+        """
+        Build a polished Adaptive Card for Teams.
+
+        `part` is (index, count) when the digest is split across several
+        cards; numbering continues from the previous parts. `total` is the
+        article count of the whole digest (defaults to this card's).
+        """
+        if total is None:
+            total = len(articles)
+        part_num, part_count = part
+        if part_count > 1:
+            date_str = f"{date_str} \u2022 Part {part_num}/{part_count}"
+
+        # ── Header ──
+        body = [
+            _TITLE_BLOCK,
+            {
                 "type": "TextBlock",
-                "text": self._category_label(category),
-                "weight": "Bolder",
-                "size": "Medium",
-                "spacing": "ExtraLarge",
-                "separator": True,
+                "text": f"{date_str}",
+                "isSubtle": True,
+                "spacing": "None",
+                "size": "Small",
+            },
+            {
+                "type": "TextBlock",
+                "text": f"**{total}** new articles across Canadian defence & sovereignty topics",
                 "wrap": True,
-            })
-
-            # Each article as a numbered entry
-            for article in cat_articles[:MAX_ARTICLES_PER_MESSAGE]:
-                article_num += 1
-                title = article.title[:MAX_TITLE_LENGTH]
-                if len(article.title) > MAX_TITLE_LENGTH:
-                    title += "..."
-
-                source = self._clean_source(article.source_name)
-                date_part = f" \u2022 {article.published_str}" if article.published else ""
+                "spacing": "Small",
+                "size": "Small",
+            },
+        ]
 
-                # Article number + clickable title
-                body.append({
-                    "type": "TextBlock",
-                    "text": f"**{article_num}.** [{title}]({article.link})",
-                    "wrap": True,
-                    "spacing": "Medium",
-                    "size": "Default",
-                })
-
-                # Source and date on a subtle line below
-                body.append({
-                    "type": "TextBlock",
-                    "text": f"\u2003\u2003{source}{date_part}",
-                    "isSubtle": True,
-                    "spacing": "None",
-                    "size": "Small",
-                    "wrap": True,
-                })
+        # ── Articles grouped by category ──
+        # Numbering runs across categories (and across earlier parts)
+        numbers = count((part_num - 1) * MAX_ARTICLES_PER_MESSAGE + 1)
+        sections = [
+            (
+                self._category_header_block(category),
+                self._category_blocks(cat_articles, numbers),
+            )
+            for category, cat_articles in self._group_articles(articles).items()
+        ]
+        body.extend(
+            chain.from_iterable([header, *blocks] for header, blocks in sections)
+        )
 
         # ── Footer ──
+        body.append(_FOOTER_RULE_BLOCK)
         body.append({
             "type": "TextBlock",
-            "text": "\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500",
-            "isSubtle": True,
-            "spacing": "Large",
-            "size": "Small",
-        })
-        body.append({
-            "type": "TextBlock",
-            "text": f"Sources: {len(articles)} articles from government feeds, think tanks, CBC, Global News, National Post, Globe and Mail & Google News",
+            "text": f"Sources: {total} articles from government feeds, think tanks, CBC, Global News, National Post, Globe and Mail & Google News",
             "isSubtle": True,
             "spacing": "None",
             "size": "Small",
             "wrap": True,
         })
 
-        # Standard webhook payload
-        payload = {
-            "type": "message",
-            "attachments": [
-                {
-                    "contentType": "application/vnd.microsoft.card.adaptive",
-                    "contentUrl": None,
-                    "content": {
-                        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-                        "type": "AdaptiveCard",
-                        "version": "1.4",
-                        "body": body,
-                    },
-                }
-            ],
-        }
-
-        return payload
+        return _card_payload(body)
 
     def _build_no_news_card(self, date_str: str) -> dict:
         """Build a card for when there are no relevant articles."""
         body = [
-            {
-                "type": "TextBlock",
-                "text": "\U0001F6E1\uFE0F Defence & Sovereignty News",
-                "weight": "Bolder",
-                "size": "ExtraLarge",
-                "wrap": True,
-                "color": "Accent",
-            },
+            _TITLE_BLOCK,
             {
                 "type": "TextBlock",
                 "text": date_str,
@@ -191,84 +333,131 @@ class TeamsSender:
             },
         ]
 
-        return {
-            "type": "message",
-            "attachments": [
-                {
-                    "contentType": "application/vnd.microsoft.card.adaptive",
-                    "contentUrl": None,
-                    "content": {
-                        "$schema": "http://adaptivecards.io/schemas/adaptive-card.json",
-                        "type": "AdaptiveCard",
-                        "version": "1.4",
-                        "body": body,
-                    },
-                }
-            ],
-        }
+        return _card_payload(body)
 
     def send_digest(
         self, articles: list, dry_run: bool = False
-    ) -> bool:
-        """Send a news digest to Teams."""
-        date_str = datetime.now(timezone.utc).strftime("%A, %B %d, %Y")
-
-        if articles:
-            payload = self._build_adaptive_card(articles, date_str)
-        else:
-            payload = self._build_no_news_card(date_str)
-
+    ) -> tuple[bool, list]:
+        """
+        Send a news digest to Teams.
+
+        Returns:
+            (success, delivered): success is True only if every part was
+            posted (or on a dry run). delivered lists the articles of the
+            parts Teams accepted: all of them on success, the leading parts
+            if a later part failed, none on a dry run.
+        """
+        # Formatted once and shared by every part, so parts never disagree
+        date_str = datetime.now(_UTC).strftime(DIGEST_DATE_FORMAT)
+
+        # The preview works from the articles alone; cards would be discarded
         if dry_run:
             logger.info("DRY RUN - Would send to Teams:")
             self._print_digest_preview(articles, date_str)
-            return True
+            return True, []
 
+        if articles:
+            # Chunk in display (category) order so sections flow across parts
+            ordered = [
+                article
+                for cat_articles in self._group_articles(articles).values()
+                for article in cat_articles
+            ]
+            chunks = [
+                ordered[i:i + MAX_ARTICLES_PER_MESSAGE]
+                for i in range(0, len(ordered), MAX_ARTICLES_PER_MESSAGE)
+            ]
+            payloads = [
+                self._build_adaptive_card(
+                    chunk, date_str, part=(n, len(chunks)), total=len(articles)
+                )
+                for n, chunk in enumerate(chunks, start=1)
+            ]
+        else:
+            chunks = [[]]
+            payloads = [self._build_no_news_card(date_str)]
+
+        if self._session is None:
+            logger.error("No Teams webhook URL configured; digest not sent")
+            return False, []
+
+        # Serialize every part before the first POST, so the send loop is
+        # pure network I/O and a bad payload can't leave a half-sent digest.
+        # Parts go out one at a time: Teams shows them in arrival order.
+        bodies = [_dumps(payload) for payload in payloads]
+
+        delivered = []
+        for n, (chunk, body) in enumerate(zip(chunks, bodies), start=1):
+            if n > 1:
+                time.sleep(PART_POST_INTERVAL)
+            label = f" (part {n}/{len(bodies)})" if len(bodies) > 1 else ""
+            if not self._post(body, label):
+                if delivered:
+                    logger.warning(
+                        f"Digest partly sent: {n - 1}/{len(bodies)} parts "
+                        f"({len(delivered)} articles) reached Teams"
+                    )
+                return False, delivered
+            delivered.extend(chunk)
+
+        logger.info(
+            f"Successfully sent digest with {len(articles)} articles to Teams"
+            + (f" in {len(payloads)} parts" if len(payloads) > 1 else "")
+        )
+        return True, delivered
+
+    def _post(self, body: bytes, label: str = "") -> bool:
+        """POST one serialized card to the webhook, returning True on success."""
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.webhook_url,
-                json=payload,
+                data=body,
                 headers={"Content-Type": "application/json"},
                 timeout=30,
             )
 
             if response.status_code in (200, 202):
-                logger.info(
-                    f"Successfully sent digest with {len(articles)} articles "
-                    f"to Teams (HTTP {response.status_code})"
+                logger.debug(
+                    f"Teams accepted card{label} (HTTP {response.status_code})"
                 )
                 return True
             else:
                 logger.error(
-                    f"Teams webhook returned {response.status_code}: "
+                    f"Teams webhook returned {response.status_code}{label}: "
                     f"{response.text[:300]}"
                 )
                 return False
 
         except requests.RequestException as e:
-            logger.error(f"Failed to send to Teams: {e}")
+            logger.error(f"Failed to send to Teams{label}: {e}")
             return False
 
     def _print_digest_preview(self, articles: list, date_str: str):
         """Print a text preview of the digest for dry-run mode."""
-        print(f"\n{'='*60}")
-        print(f"  Defence & Sovereignty News")
-        print(f"  {date_str}  |  {len(articles)} articles")
-        print(f"{'='*60}")
+        # Assembled first and written once, instead of one print per line
+        lines = [
+            f"\n{'='*60}",
+            f"  Defence & Sovereignty News",
+            f"  {date_str}  |  {len(articles)} articles",
+            f"{'='*60}",
+        ]
 
         if not articles:
-            print("\n  No new relevant articles found today.\n")
+            lines.append("\n  No new relevant articles found today.\n")
+            sys.stdout.write("\n".join(lines) + "\n")
             return
 
         grouped = self._group_articles(articles)
         num = 0
 
         for category, cat_articles in grouped.items():
-            print(f"\n  {self._category_label(category)}")
-            print(f"  {'─' * 40}")
+            lines.append(f"\n  {self._category_label(category)}")
+            lines.append(f"  {'─' * 40}")
             for article in cat_articles:
                 num += 1
                 source = self._clean_source(article.source_name)
-                print(f"  {num}. {article.title[:75]}")
-                print(f"     {source} \u2022 {article.published_str}")
+                lines.append(f"  {num}. {article.title[:75]}")
+                lines.append(f"     {source} \u2022 {article.published_str}")
 
-        print(f"\n{'='*60}\n")
+        lines.append(f"\n{'='*60}\n")
+        sys.stdout.write("\n".join(lines) + "\n")